@@ -1,37 +1,296 @@
 # src/main.py
+import os
+import queue
 import sys
+import tempfile
+from bisect import bisect, bisect_left
+from collections import OrderedDict
 from importlib.resources import files, as_file
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QFileDialog,
-    QInputDialog, QSplitter, QGraphicsLineItem, QGraphicsSimpleTextItem,
-    QGraphicsRectItem, QGraphicsItem, QGraphicsTextItem, QMessageBox,
-    QGraphicsPixmapItem
+    QInputDialog, QSplitter, QGraphicsPathItem, QGraphicsSimpleTextItem,
+    QGraphicsRectItem, QGraphicsItem, QGraphicsItemGroup, QGraphicsTextItem,
+    QMessageBox, QGraphicsPixmapItem, QRubberBand
+)
+from PySide6.QtGui import (
+    QAction, QPixmap, QPixmapCache, QPen, QFont, QFontMetricsF, QColor,
+    QPainter, QPainterPath, QPageSize, QImage, QImageReader, QSurfaceFormat
+)
+from PySide6.QtCore import (
+    Qt, QRect, QSize, QSizeF, QPoint, QRectF, QPointF, QLineF, QTimer,
+    QElapsedTimer, QObject, QRunnable, QThreadPool, Signal
 )
-from PySide6.QtGui import QAction, QPixmap, QPen, QFont, QColor, QPainter, QPageSize
-from PySide6.QtCore import Qt, QRect, QSize, QSizeF, QPoint, QRectF, QPointF
 from PySide6.QtPrintSupport import QPrinter
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:  #no OpenGL module on this install; stay on the raster path
+    QOpenGLWidget = None
+
+#flip to False to keep both views on the raster viewport (e.g. machines with
+#broken GL drivers)
+USE_OPENGL_VIEWS = True
+
+#how many smooth-scaled pixmaps we keep per band (smooth scaling is the
+#slowest thing in this module, so repeated widths should never be recomputed)
+_SCALE_CACHE_MAX = 32
+
+#how long after the last fast (key-repeat) resize before we re-run it smoothly
+_SMOOTH_SETTLE_MS = 150
+
+#largest dimension we decode for on-screen display; 600 dpi scans are decoded
+#at reduced size and only the cropped region is re-read at full resolution
+_MAX_DECODE_DIM = 4096
+
+#shared paint resources: each QFont construction triggers a font-database
+#lookup, so build every size exactly once
+_BLACK_PEN = QPen(Qt.black)
+_BORDER_PEN = QPen(Qt.black, 1.5)
+_fonts = {}
+
+def _shared_font(point_size: int) -> QFont:
+    font = _fonts.get(point_size)
+    if font is None:
+        font = _fonts[point_size] = QFont("Arial", point_size)
+    return font
+
+def _band_orig_pixmap(band: dict) -> QPixmap:
+    #full-resolution crops live on disk; QPixmapCache is the in-RAM tier, so a
+    #figure full of bands does not pin every source crop in memory
+    key = "wbtool/orig:" + band["orig_path"]
+    pm = QPixmapCache.find(key)
+    if pm is None or pm.isNull():
+        pm = QPixmap(band["orig_path"])
+        QPixmapCache.insert(key, pm)
+    return pm
+
+def _band_preview_pixmap(band: dict, new_width: int) -> QPixmap:
+    #fast previews don't need full-resolution pixels: keep a small working
+    #copy (~2x the width the band had when first previewed) and scale from
+    #that; orig_path stays the source of truth for the smooth passes
+    work = band.get("work_pm")
+    if work is None:
+        orig = _band_orig_pixmap(band)
+        cap = 2 * int(band["width"])
+        if cap >= orig.width():
+            work = orig
+        else:
+            work = orig.scaledToWidth(cap, Qt.FastTransformation)
+        band["work_pm"] = work
+    if new_width > work.width():
+        #grown past the working copy - fall back to the full-res source
+        return _band_orig_pixmap(band)
+    return work
+
+def _cached_scaled_pixmap(band: dict, new_width: int):
+    #lookup-only: per-band LRU of smooth-scaled pixmaps with QPixmapCache as
+    #the global second tier; returns None on a miss (the caller decides where
+    #to compute - misses are smooth-scaled on the thread pool)
+    cache = band.setdefault("scale_cache", OrderedDict())
+    if new_width in cache:
+        cache.move_to_end(new_width)
+        return cache[new_width]
+    pm = QPixmapCache.find(f"{band['orig_path']}:{new_width}")
+    if pm is not None and not pm.isNull():
+        cache[new_width] = pm
+        if len(cache) > _SCALE_CACHE_MAX:
+            cache.popitem(last=False)
+        return pm
+    return None
+
+def _text_pixmap(text: str, font: QFont) -> QPixmap:
+    #rendered-text cache: the same labels come back at every width a band
+    #visits, so shape/draw each (font, text) pair only once
+    key = f"wbtool/text:{font.family()}:{font.pointSize()}:{text}"
+    pm = QPixmapCache.find(key)
+    if pm is None or pm.isNull():
+        fm = QFontMetricsF(font)
+        pm = QPixmap(max(1, int(fm.horizontalAdvance(text)) + 1), max(1, int(fm.height()) + 1))
+        pm.fill(Qt.transparent)
+        painter = QPainter(pm)
+        painter.setFont(font)
+        painter.setPen(_BLACK_PEN)
+        painter.drawText(QPointF(0.0, fm.ascent()), text)
+        painter.end()
+        QPixmapCache.insert(key, pm)
+    return pm
+
+def _render_annotation_pixmap(band: dict, scaled_w: int, scaled_h: int):
+    #rasterize ticks + kDa labels + protein name + border into one transparent
+    #pixmap so the band carries a single annotation child instead of 2*N+2 items
+    cache = band.setdefault("anno_cache", OrderedDict())
+    if scaled_w in cache:
+        cache.move_to_end(scaled_w)
+        return cache[scaled_w]
+
+    label_font = _shared_font(10)
+    name_font = _shared_font(12)
+    label_fm = QFontMetricsF(label_font)
+    name_fm = QFontMetricsF(name_font)
+
+    #text metrics never change for a band - measure them once and keep them
+    #in the band dict instead of re-running text layout per width
+    labels = band.get("labels")
+    if labels is None:
+        labels = band["labels"] = [f"{k:g}" for k in band["kda"]]
+        band["label_ws"] = [label_fm.horizontalAdvance(t) for t in labels]
+        band["name_w"] = name_fm.horizontalAdvance(band["protein_name"])
+    label_ws = band["label_ws"]
+    name_w = band["name_w"]
+    #tick is 20 px ending 2 px left of the image, label 6 px left of the tick
+    left_w = int(22 + 6 + max(label_ws)) + 1 if labels else 0
+    right_w = int(10 + name_w) + 1
+    #labels are vertically centered on their tick, so they can poke above/below the image
+    pad_y = int(max(label_fm.height(), name_fm.height()) / 2) + 1
+
+    pm = QPixmap(left_w + scaled_w + right_w, scaled_h + 2 * pad_y)
+    pm.fill(Qt.transparent)
+    painter = QPainter(pm)
+    painter.translate(left_w, pad_y)  #paint in image coordinates
+
+    #black frame around the crop (image area)
+    painter.setPen(_BORDER_PEN)
+    painter.drawRect(QRectF(0, 0, scaled_w, scaled_h))
+
+    #y_locals live in the on-screen crop-rect space, which can be coarser than
+    #orig_pixmap when the source was re-read at full resolution
+    scale = scaled_w / band["src_w"]
+    painter.setPen(_BLACK_PEN)
+    #compute all tick ys in one pass and hand the lines to Qt as a single batch;
+    #bind the constructors locally so the loops skip repeated global lookups
+    line, point = QLineF, QPointF
+    draw_pm, text_pm = painter.drawPixmap, _text_pixmap
+    ys = [y_local * scale for y_local in band["y_locals"]]
+    if ys:
+        painter.drawLines([line(-22.0, y, -2.0, y) for y in ys])
+    half_lh = label_fm.height() / 2.0
+    for text, w, y in zip(labels, label_ws, ys):
+        draw_pm(point(-28.0 - w, y - half_lh), text_pm(text, label_font))
+
+    #protein name at right, vertically centered
+    painter.drawPixmap(QPointF(scaled_w + 10.0, scaled_h / 2.0 - name_fm.height() / 2.0),
+                       _text_pixmap(band["protein_name"], name_font))
+    painter.end()
+
+    entry = (pm, left_w, pad_y, name_w)
+    cache[scaled_w] = entry
+    if len(cache) > _SCALE_CACHE_MAX:
+        cache.popitem(last=False)
+    return entry
+
+
+#width of the small preview entry pre-baked for every crop
+_THUMB_WIDTH = 128
+
+class _ScaleSignals(QObject):
+    #token identifies the crop the result belongs to
+    done = Signal(int, int, QImage)
+
+class _ImageScaleTask(QRunnable):
+    #smooth-scales a QImage off the GUI thread (QPixmap itself may only be
+    #touched on the GUI thread, so the worker gets a QImage copy)
+    def __init__(self, token: int, image: QImage, width: int, signals: _ScaleSignals):
+        super().__init__()
+        self.token = token
+        self.image = image
+        self.width = width
+        self.signals = signals
+
+    def run(self):
+        img = self.image
+        if img.isNull():
+            #source went away between scheduling and running (e.g. the spilled
+            #crop was deleted); a raise here would just vanish in the pool
+            return
+        #extreme shrinks: walk down a transient powers-of-two pyramid - each
+        #smooth 2x halving is a cheap box average that keeps every source
+        #sample contributing, unlike one giant shrink (slow) or nearest
+        #neighbour (drops 3/4 of the pixels per level, aliasing gel noise)
+        while img.width() >= self.width * 4 and img.width() >= 2:
+            img = img.scaled(img.width() // 2, max(1, img.height() // 2),
+                             Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        #h already preserves aspect; KeepAspectRatio here would re-derive the
+        #width from the rounded height and come back 1 px short
+        h = max(1, round(img.height() * self.width / img.width()))
+        out = img.scaled(self.width, h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        self.signals.done.emit(self.token, self.width, out)
+
+
+#cap on pixels rendered per strip while rasterizing the figure for PDF export
+_EXPORT_STRIP_PX = 32_000_000
+
+class _PdfExportSignals(QObject):
+    finished = Signal(str)  #empty string on success, error text otherwise
+    need_strip = Signal()   #worker consumed a strip; GUI may render the next
+
+class _PdfWriteTask(QRunnable):
+    #writes pre-rendered strips into the PDF off the GUI thread (QPainter may
+    #paint on a QPrinter from a worker thread; QGraphicsScene may not be
+    #rendered there, which is why the strips arrive pre-rasterized). Strips
+    #stream through a queue one at a time - the GUI renders the next one only
+    #after the previous is written, so peak memory is ~2 strips, never the
+    #whole page raster
+    def __init__(self, path: str, dpi: int, strips, signals: _PdfExportSignals):
+        super().__init__()
+        self.path = path
+        self.dpi = dpi
+        self.strips = strips  # Queue of (QPointF in page device px, QImage); None ends the stream
+        self.signals = signals
+
+    def run(self):
+        printer = QPrinter(QPrinter.HighResolution)
+        printer.setOutputFormat(QPrinter.PdfFormat)
+        printer.setOutputFileName(self.path)
+        printer.setResolution(self.dpi)
+        printer.setPageSize(QPageSize.A4)
+        painter = QPainter()
+        if not painter.begin(printer):
+            self.signals.finished.emit("Could not open the PDF file for writing.")
+            return
+        while True:
+            item = self.strips.get()
+            if item is None:
+                break
+            pos, image = item
+            painter.drawImage(pos, image)
+            del image  #drop our reference before asking for more
+            self.signals.need_strip.emit()
+        painter.end()
+        self.signals.finished.emit("")
 
 # ---------- View that supports mark & crop ----------
 class CanvasView(QGraphicsView):
     #Initializing (no rectangle until it's made)
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.rubberBand = None
+        self.rubberBand = QRubberBand(QRubberBand.Rectangle, self)
+        self.rubberBand.hide()
         self.origin = QPoint()
         self.mode = None             # None | "crop" | "mark". When not in crop mode, 'None'
         self.crop_callback = None
         self.mark_callback = None
+        #high-polling mice deliver moves far faster than the viewport paints;
+        #coalesce them and apply the latest one at ~60 Hz
+        self._pending_rb_pos = None
+        self._rb_timer = QTimer(self)
+        self._rb_timer.setInterval(16)
+        self._rb_timer.timeout.connect(self._apply_rubberband)
+        #mirror of rubberBand visibility so the move handler tests a plain
+        #bool instead of calling into the widget every event
+        self._rb_active = False
 
     #What to do in response to mouse
     def mousePressEvent(self, event):
+        #no tool active: hand straight off to Qt (panning, item selection)
+        if self.mode is None:
+            return super().mousePressEvent(event)
         #When clicked in crop mode, make a (0,0) size rectangle
         if event.button() == Qt.LeftButton and self.mode == "crop" and self.crop_callback:
-            from PySide6.QtWidgets import QRubberBand
-            self.origin = event.pos() 
-            if self.rubberBand is None:
-                self.rubberBand = QRubberBand(QRubberBand.Rectangle, self)
-            self.rubberBand.setGeometry(QRect(self.origin, QSize())) #QSize() is (0,0) 
+            self.origin = event.pos()
+            self.rubberBand.setGeometry(QRect(self.origin, QSize())) #QSize() is (0,0)
             self.rubberBand.show()
+            self._rb_active = True
+            self._pending_rb_pos = None
+            self._rb_timer.start()
         
         #Upon mouse click in kDa marking mode, save the y coordinates 
         elif event.button() == Qt.LeftButton and self.mode == "mark" and self.mark_callback:
@@ -41,19 +300,36 @@ class CanvasView(QGraphicsView):
             super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
-        #Resize the rectangle when mouse is dragged in crop mode
-        if self.rubberBand and self.rubberBand.isVisible():
-            rect = QRect(self.origin, event.pos()).normalized()
-            self.rubberBand.setGeometry(rect)
+        if self.mode is None:
+            return super().mouseMoveEvent(event)
+        #Remember the latest drag position; the timer resizes the rectangle
+        if self._rb_active:
+            self._pending_rb_pos = event.pos()
         else:
             super().mouseMoveEvent(event)
 
+    def _apply_rubberband(self):
+        #apply the most recent (coalesced) drag position once per tick
+        if self._pending_rb_pos is not None:
+            rect = QRect(self.origin, self._pending_rb_pos).normalized()
+            self.rubberBand.setGeometry(rect)
+            self._pending_rb_pos = None
+
     def mouseReleaseEvent(self, event):
+        if self.mode is None:
+            return super().mouseReleaseEvent(event)
         #When crop rectangle is ready, call the crop function, then exit crop mode
-        if self.rubberBand and self.rubberBand.isVisible():
+        if self._rb_active:
+            self._rb_active = False
+            self._rb_timer.stop()
+            self._pending_rb_pos = None  #release position is authoritative
             self.rubberBand.hide() #no need to show anymore
             rect = QRect(self.origin, event.pos()).normalized()
-            scene_rect = self.mapToScene(rect).boundingRect().toRect()
+            #map just the two corners: mapToScene(QRect) goes through a whole
+            #QPolygonF + bounding-rect round trip
+            tl = self.mapToScene(rect.topLeft()).toPoint()
+            br = self.mapToScene(rect.bottomRight()).toPoint()
+            scene_rect = QRect(tl, br).normalized()
             if self.crop_callback:
                 self.crop_callback(scene_rect)
             self.mode = None
@@ -63,21 +339,27 @@ class CanvasView(QGraphicsView):
 
 #----------- Container for one band: image+labels
 class BandGroup(QGraphicsRectItem):
+    #bound at class scope so the hot itemChange path skips the enum lookups
+    _ItemPositionChange = QGraphicsItem.ItemPositionChange
+
     def __init__(self, locked_x: float | None = None):
         super().__init__()
         self.locked_x = locked_x
+        #NaN sentinel: "x == x" is False only for NaN, so the unlocked case
+        #needs no is-None test in itemChange
+        self._locked_x_f = float("nan") if locked_x is None else float(locked_x)
         self.setPen(Qt.NoPen)
         self.setBrush(Qt.NoBrush)
-        
+
         self.setFlag(QGraphicsItem.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
-        
+
     def itemChange(self, change, value):
     # Optional: lock x so it moves only up/down
-        if change == QGraphicsItem.ItemPositionChange and self.locked_x is not None:
-            pos = QPointF(value)
-            return QPointF(self.locked_x, pos.y())
+    # called for every change while dragging, so keep the common exits cheap
+        if change == self._ItemPositionChange and self._locked_x_f == self._locked_x_f:
+            return QPointF(self._locked_x_f, value.y())  #value is already a QPointF here
         return super().itemChange(change, value)
 
 
@@ -90,32 +372,88 @@ class MainWindow(QMainWindow):
         # Setting up gel image area (left)
         self.image_left_margin = 80
         self.current_pixmap = None
+        self.current_image_path = None
+        self.image_decode_scale = 1.0   # displayed px per source px (<= 1)
         self.pixmap_item = None
-        self.kda_markers = []  # [{y, kda, line, text}]
+        self.kda_markers = []  # [{y, kda, line, text}], kept sorted by y
+        self._marker_ys = []   # parallel sorted y list for bisect lookups
+        self.marker_group = None  # one container item for all marker lines/labels
+        self.marker_tick_item = None  # every tick dash lives in this one path item
+        self._startup_items = None  # built once by show_startup_message, then toggled
+        self._batch_mark_ys = None  # clicked y positions while batch-marking a ladder
+        self._bump_clock = QElapsedTimer()  # time since the last width preview
+        self._bump_clock.start()
 
         self.image_scene = QGraphicsScene(self)
+        #the image scene only ever holds a few dozen items; skipping the BSP
+        #index avoids re-indexing on every marker add
+        self.image_scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.image_view = CanvasView(self)
         self.image_view.setScene(self.image_scene)
         self.image_view.setAlignment(Qt.AlignCenter)
         self.image_view.setBackgroundBrush(QColor(230, 230, 230))
+        #GL viewports only support full-viewport updates (one cheap blit); on
+        #the raster fallback let Qt union dirty rects instead of repainting
+        #everything or tracking each item separately
+        use_gl = USE_OPENGL_VIEWS and QOpenGLWidget is not None
+        update_mode = (QGraphicsView.FullViewportUpdate if use_gl
+                       else QGraphicsView.SmartViewportUpdate)
+        if use_gl:
+            self.image_view.setViewport(QOpenGLWidget())
+        self.image_view.setViewportUpdateMode(update_mode)
 
         #Setting up figure area (right)
         self.figure_left_margin = 80
         self.figure_scene = QGraphicsScene(self)
+        #bands are few and user-movable; a BSP index would be rebuilt on every
+        #drag for no lookup benefit
+        self.figure_scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.figure_view = QGraphicsView(self.figure_scene)
         self.figure_view.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         self.figure_view.setBackgroundBrush(QColor(247, 247, 247))
+        #composite the (pixmap-heavy) figure on the GPU as well
+        if use_gl:
+            self.figure_view.setViewport(QOpenGLWidget())
+        self.figure_view.setViewportUpdateMode(update_mode)
+        #everything here is axis-aligned lines and pixmaps blitted 1:1 at their
+        #pre-scaled size; only text gains anything from antialiasing
+        self.figure_view.setRenderHints(QPainter.TextAntialiasing)
 
         self.figure_next_y = 20
         self.figure_min_width = 900
-        self.figure_scene.setSceneRect(0, 0, self.figure_min_width, 1200)
+        #scene size mirrored in plain floats so the grow checks never round-trip
+        #through sceneRect()
+        self._scene_w = float(self.figure_min_width)
+        self._scene_h = 1200.0
+        self.figure_scene.setSceneRect(0, 0, self._scene_w, self._scene_h)
 
         # bands registry + selection + default size (BY WIDTH)
         self.figure_bands = []            # list of dicts (see add_band_to_figure), empty in the beginning
+        self._group_to_band = {}          # BandGroup -> band dict, for selection lookups
         self.selected_band = None
         self.last_band_width = None       # px; new bands default to this width
         self.figure_scene.selectionChanged.connect(self.on_selection_changed)
 
+        # background pre-scaling of fresh crops (results arrive while the
+        # protein-name dialog is still up, so first paint skips the smooth scale)
+        self._scale_signals = _ScaleSignals()
+        self._scale_signals.done.connect(self._on_scaled_image_ready)
+        self._prescaled = {}       # token -> {width: QImage}, not yet claimed by a band
+        self._prescale_bands = {}  # token -> band dict, once the band exists
+        self._prescale_pending = {}  # token -> results still in flight
+        self._resize_bands = {}    # token -> band dict for in-flight smooth resizes
+        self._next_scale_token = 0
+
+        self._pdf_signals = _PdfExportSignals()
+        self._pdf_signals.finished.connect(self._on_pdf_export_finished)
+        self._pdf_signals.need_strip.connect(self._render_next_export_strip)
+        self._export_job = None  # in-flight PDF export state, one at a time
+
+        # full-res crops are spilled here; QPixmapCache holds the hot ones
+        self._crop_store = tempfile.TemporaryDirectory(prefix="wbtool-crops-")
+        self._crop_seq = 0
+        QPixmapCache.setCacheLimit(64 * 1024)  # KB; default 10 MB is too tight for gel crops
+
         #Layout: image area and figure area
         splitter = QSplitter(self)
         splitter.addWidget(self.image_view)
@@ -134,6 +472,10 @@ class MainWindow(QMainWindow):
         mark_action.triggered.connect(self.enable_mark_mode)
         tools_menu.addAction(mark_action)
 
+        batch_mark_action = QAction("Mark kDa Ladder (Batch)", self)
+        batch_mark_action.triggered.connect(self.toggle_batch_mark_mode)
+        tools_menu.addAction(batch_mark_action)
+
         undo_mark_action = QAction("Undo Last kDa", self)
         undo_mark_action.triggered.connect(self.undo_last_kda)
         tools_menu.addAction(undo_mark_action)
@@ -165,6 +507,10 @@ class MainWindow(QMainWindow):
         setw_action = QAction("Set Width…", self)
         setw_action.triggered.connect(self.set_selected_width_dialog)
         fig_menu.addAction(setw_action)
+
+        matchw_action = QAction("Match All Widths to Selected", self)
+        matchw_action.triggered.connect(self.match_widths_to_selected)
+        fig_menu.addAction(matchw_action)
         
         #crops positioning (arrow keys)
         move_up = QAction("Move Up", self)
@@ -189,11 +535,16 @@ class MainWindow(QMainWindow):
 
     # ---------- Startup message ----------
     def show_startup_message(self):
-        self.image_scene.clear()
-        self.kda_markers.clear()
-        self.pixmap_item = None
+        #items are built once and toggled; no scene.clear / rebuild churn
+        self.clear_all_kda()
+        if self.pixmap_item is not None:
+            self.pixmap_item.setVisible(False)
         W, H = 700, 650
         self.image_scene.setSceneRect(0, 0, W, H)
+        if self._startup_items is not None:
+            for it in self._startup_items:
+                it.setVisible(True)
+            return
         #startup text
         html = """
         <div style="color:#444; font-family:Segoe UI, Arial, Helvetica;">
@@ -210,6 +561,8 @@ class MainWindow(QMainWindow):
         msg = QGraphicsTextItem()
         msg.setTextWidth(520)
         msg.setHtml(html)
+        #static rich text: cache the rendered pixels instead of re-laying out per paint
+        msg.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
         br = msg.boundingRect()
         msg.setPos((W - br.width())/2, (H - br.height())/2)
         pad = 12
@@ -220,6 +573,7 @@ class MainWindow(QMainWindow):
         bg.setZValue(-1)
         self.image_scene.addItem(bg)
         self.image_scene.addItem(msg)
+        self._startup_items = [bg, msg]
 
     # ---------- Image I/O ----------
     def open_image(self):
@@ -231,14 +585,40 @@ class MainWindow(QMainWindow):
         )
         if not path:
             return
-        pm = QPixmap(path)
-        if pm.isNull():
+        #decode at display size instead of full scan resolution; crops re-read
+        #their region from the file at full resolution later
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        self.image_decode_scale = 1.0
+        if size.isValid() and max(size.width(), size.height()) > _MAX_DECODE_DIM:
+            scaled = size.scaled(_MAX_DECODE_DIM, _MAX_DECODE_DIM, Qt.KeepAspectRatio)
+            reader.setScaledSize(scaled)
+            self.image_decode_scale = scaled.width() / size.width()
+        img = reader.read()
+        if img.isNull():
             QMessageBox.warning(self, "Load error", "Could not load that image.")
             return
+        #some formats don't report their size before decoding; downscale after
+        #the fact so the displayed pixmap never exceeds the cap either way
+        if not size.isValid() and max(img.width(), img.height()) > _MAX_DECODE_DIM:
+            full_w = img.width()
+            img = img.scaled(_MAX_DECODE_DIM, _MAX_DECODE_DIM,
+                             Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.image_decode_scale = img.width() / full_w
+        pm = QPixmap.fromImage(img)
         self.current_pixmap = pm
-        self.image_scene.clear()
-        self.kda_markers.clear()  #Clear the previous markers info
-        self.pixmap_item = self.image_scene.addPixmap(pm)
+        self.current_image_path = path
+        #reuse the persistent pixmap item instead of tearing the scene down
+        if self._startup_items is not None:
+            for it in self._startup_items:
+                it.setVisible(False)
+        self.clear_all_kda()  #Clear the previous markers info
+        if self.pixmap_item is None:
+            self.pixmap_item = self.image_scene.addPixmap(pm)
+        else:
+            self.pixmap_item.setPixmap(pm)
+            self.pixmap_item.setVisible(True)
         self.pixmap_item.setPos(self.image_left_margin, 0)
         self.image_scene.setSceneRect(0, 0, pm.width()+self.image_left_margin+10, pm.height())
         self.image_view.fitInView(self.image_scene.sceneRect(), Qt.KeepAspectRatio)
@@ -256,37 +636,105 @@ class MainWindow(QMainWindow):
         val, ok = QInputDialog.getDouble(self, "kDa value", "Enter kDa:", 0.0, 0.0, 1_000_000.0, 1)
         if not ok or self.pixmap_item is None:
             return
-        
+        self._add_marker_items(scene_y, val)
+
+    def _add_marker_items(self, scene_y: float, val: float):
         #Position & params for the marker: on the left of the image, on the clicked y
         x1 = self.image_left_margin - 2.0
         x0 = x1 - 20.0
-        pen = QPen(Qt.black)
-        line_item = QGraphicsLineItem(x0, scene_y, x1, scene_y)
-        line_item.setPen(pen)
-        self.image_scene.addItem(line_item)
-        label = QGraphicsSimpleTextItem(f"{val:g}")
-        label.setFont(QFont("Arial", 50))
+        group = self._ensure_marker_group()
+        label = QGraphicsSimpleTextItem(f"{val:g}", group)
+        label.setFont(_shared_font(50))
         label.setBrush(Qt.black)
         br = label.boundingRect()
         label.setPos(x0 - 6.0 - br.width(), scene_y - br.height()/2.0)
-        self.image_scene.addItem(label)
-        self.kda_markers.append({"y": float(scene_y), "kda": float(val), "line": line_item, "text": label})
-        self.kda_markers.sort(key=lambda d: d["y"])
+        entry = {"y": float(scene_y), "kda": float(val), "text": label}
+        #sorted insert instead of append + full resort; the parallel y list
+        #gives bisect its keys without rebuilding them per insert
+        i = bisect(self._marker_ys, entry["y"])
+        self._marker_ys.insert(i, entry["y"])
+        self.kda_markers.insert(i, entry)
+        self._rebuild_marker_ticks()
+
+    def toggle_batch_mark_mode(self):
+        #fast path for whole ladders: collect clicks first, ask for all the
+        #values in one dialog instead of one modal dialog per band
+        if self.current_pixmap is None:
+            return
+        if self._batch_mark_ys is None:
+            self._batch_mark_ys = []
+            self.image_view.mode = "mark"
+            self.image_view.mark_callback = self._batch_mark_ys.append
+        else:
+            self.finish_batch_mark()
+
+    def finish_batch_mark(self):
+        #second trigger of the batch action: ask for the values and build all markers
+        ys, self._batch_mark_ys = self._batch_mark_ys, None
+        self.image_view.mode = None
+        self.image_view.mark_callback = None
+        if not ys:
+            return
+        text, ok = QInputDialog.getMultiLineText(
+            self, "kDa values",
+            f"Enter {len(ys)} kDa values, one per line,\nin the order you clicked:"
+        )
+        if not ok:
+            return
+        try:
+            vals = [float(t) for t in text.split()]
+        except ValueError:
+            QMessageBox.warning(self, "Bad value", "Could not read those kDa values.")
+            return
+        if len(vals) != len(ys):
+            QMessageBox.warning(
+                self, "Count mismatch",
+                f"You clicked {len(ys)} positions but entered {len(vals)} values."
+            )
+            return
+        for y, v in zip(ys, vals):
+            self._add_marker_items(y, v)
+
+    def _ensure_marker_group(self):
+        #single top-level container for marker items: parenting a new line/label
+        #to it leaves the scene's top level untouched
+        if self.marker_group is None:
+            self.marker_group = QGraphicsItemGroup()
+            self.marker_group.setHandlesChildEvents(False)
+            self.image_scene.addItem(self.marker_group)
+        return self.marker_group
+
+    def _rebuild_marker_ticks(self):
+        #all tick dashes share one pen, so they can live in a single path item:
+        #one setPath per add/undo/clear instead of a scene item per marker
+        x1 = self.image_left_margin - 2.0
+        x0 = x1 - 20.0
+        path = QPainterPath()
+        for y in self._marker_ys:
+            path.moveTo(x0, y)
+            path.lineTo(x1, y)
+        if self.marker_tick_item is None:
+            self.marker_tick_item = QGraphicsPathItem(path, self._ensure_marker_group())
+            self.marker_tick_item.setPen(_BLACK_PEN)
+        else:
+            self.marker_tick_item.setPath(path)
 
     #Clear last marker
     def undo_last_kda(self):
         if not self.kda_markers:
             return
         last = self.kda_markers.pop()
-        self.image_scene.removeItem(last["line"])
+        self._marker_ys.pop()
         self.image_scene.removeItem(last["text"])
+        self._rebuild_marker_ticks()
 
     #Clear all markers
     def clear_all_kda(self):
         for d in self.kda_markers:
-            self.image_scene.removeItem(d["line"])
             self.image_scene.removeItem(d["text"])
         self.kda_markers.clear()
+        self._marker_ys.clear()
+        self._rebuild_marker_ticks()
 
     # ---------- Cropping ----------
     def enable_crop_mode(self):
@@ -301,20 +749,103 @@ class MainWindow(QMainWindow):
         #change the rectangle coordinate system
         offset = self.pixmap_item.pos().toPoint()
         pix_rect = scene_rect.translated(-offset)
-        cropped = self.current_pixmap.copy(pix_rect)
+        cropped = self._crop_source_region(pix_rect)
         if cropped.isNull():
             return
-        #only markers inside the cropped area are relevant
-        inside = [m for m in self.kda_markers if scene_rect.top() <= m["y"] <= scene_rect.bottom()]
+        #start scaling the crop in the background while the user types the name
+        token = self._start_prescale(cropped)
+        #only markers inside the cropped area are relevant; the marker list is
+        #sorted by y, so slice it with two binary searches
+        lo = bisect_left(self._marker_ys, float(scene_rect.top()))
+        hi = bisect(self._marker_ys, float(scene_rect.bottom()))
+        inside = self.kda_markers[lo:hi]
         #ask the protein name
         protein, ok = QInputDialog.getText(self, "Protein name", "Enter protein name:")
         if not ok:
+            #nobody will claim the pre-scales now; drop what's parked and let
+            #any still-running workers find their token gone and be discarded
+            self._prescaled.pop(token, None)
+            self._prescale_pending.pop(token, None)
             return
         #call the function that adds it to the figure
-        self.add_band_to_figure(cropped, inside, scene_rect, protein.strip() or "Protein")
+        self.add_band_to_figure(cropped, inside, scene_rect, protein.strip() or "Protein", token)
+
+    def _crop_source_region(self, pix_rect: QRect) -> QPixmap:
+        #when the displayed gel was decoded downscaled, re-read just this region
+        #from the file at full resolution so bands keep the scan quality
+        s = self.image_decode_scale
+        if s < 1.0 and self.current_image_path:
+            full_rect = QRect(
+                round(pix_rect.x() / s), round(pix_rect.y() / s),
+                round(pix_rect.width() / s), round(pix_rect.height() / s),
+            )
+            reader = QImageReader(self.current_image_path)
+            reader.setAutoTransform(True)
+            reader.setClipRect(full_rect)
+            img = reader.read()
+            if not img.isNull():
+                return QPixmap.fromImage(img)
+        return self.current_pixmap.copy(pix_rect)
+
+    def _start_prescale(self, pixmap: QPixmap) -> int:
+        #queue smooth scales of a fresh crop on the global thread pool: the
+        #likely display width (inherited from the last band) plus a small
+        #preview width that seeds the cache for aggressive shrinks
+        self._next_scale_token += 1
+        token = self._next_scale_token
+        self._prescaled[token] = {}
+        image = pixmap.toImage()
+        widths = {_THUMB_WIDTH}
+        if self.last_band_width:
+            widths.add(int(self.last_band_width))
+        pool = QThreadPool.globalInstance()
+        started = 0
+        for w in widths:
+            if w > 0 and w != pixmap.width():
+                pool.start(_ImageScaleTask(token, image, w, self._scale_signals))
+                started += 1
+        if not started:
+            #nothing queued - don't hand out a token nobody will ever resolve
+            del self._prescaled[token]
+            return 0
+        self._prescale_pending[token] = started
+        return token
+
+    def _seed_scale_cache(self, band: dict, width: int, image: QImage) -> QPixmap:
+        #converts a worker result to QPixmap (GUI thread) and files it in the caches
+        pm = QPixmap.fromImage(image)
+        cache = band.setdefault("scale_cache", OrderedDict())
+        cache[width] = pm
+        if len(cache) > _SCALE_CACHE_MAX:
+            cache.popitem(last=False)
+        QPixmapCache.insert(f"{band['orig_path']}:{width}", pm)
+        return pm
+
+    def _on_scaled_image_ready(self, token: int, width: int, image: QImage):
+        band = self._resize_bands.pop(token, None)
+        if band is None:
+            band = self._prescale_bands.get(token)
+        if band is not None:
+            pm = self._seed_scale_cache(band, width, image)
+            #swap the smooth pixels in unless the user has moved on to another width
+            if band["width"] == width:
+                self._apply_band_pixmap(band, width, pm)
+        elif token in self._prescaled:
+            #band not created yet; park the result until add_band_to_figure claims it
+            self._prescaled[token][width] = image
+        #once a token's last in-flight result has landed, its band registration
+        #can go too - otherwise cancelled/finished crops accumulate forever
+        left = self._prescale_pending.get(token)
+        if left is not None:
+            if left > 1:
+                self._prescale_pending[token] = left - 1
+            else:
+                del self._prescale_pending[token]
+                self._prescale_bands.pop(token, None)
 
     # ---------- Figure placement & width-based resizing ----------
-    def add_band_to_figure(self, pixmap: QPixmap, markers, src_scene_rect: QRectF, protein_name: str):
+    def add_band_to_figure(self, pixmap: QPixmap, markers, src_scene_rect: QRectF,
+                           protein_name: str, prescale_token: int | None = None):
         #adds the cropped area with ticks and annotation to the figure
         #code-wise: creates the bandgroup; all items are children -> move together
         
@@ -325,10 +856,20 @@ class MainWindow(QMainWindow):
         # default width = last band's width (if any)
         target_w = int(self.last_band_width) if self.last_band_width else pixmap.width()
         target_w = min(target_w, max_band_w) #in case the image is too big
-        scaled_pm = pixmap.scaledToWidth(target_w, Qt.SmoothTransformation)
-        scale = target_w / pixmap.width()   # uniform scale (height scales by same factor)
-        
-        
+
+        #use the background pre-scaled result when it already arrived
+        ready = self._prescaled.pop(prescale_token, {}) if prescale_token else {}
+        needs_smooth = False
+        if target_w in ready:
+            scaled_pm = QPixmap.fromImage(ready.pop(target_w))
+        elif target_w == pixmap.width():
+            scaled_pm = pixmap
+        else:
+            #show a fast scale right away; the smooth pass lands once idle
+            scaled_pm = pixmap.scaledToWidth(target_w, Qt.FastTransformation)
+            needs_smooth = True
+
+
         #making movable selectable container
         y0 = self.figure_next_y
         group = BandGroup(locked_x=self.figure_left_margin)   # lock_x=None for free movement
@@ -340,102 +881,125 @@ class MainWindow(QMainWindow):
         #image as a child of the group
         pix_item = QGraphicsPixmapItem(scaled_pm, group)
         pix_item.setPos(0, 0)
-        
-        # black frame around the crop (image area)
-        border = QGraphicsRectItem(0, 0, scaled_pm.width(), scaled_pm.height(), group)
-        border.setPen(QPen(Qt.black, 1.5))
-        border.setBrush(Qt.NoBrush)
-        border.setZValue(10)  # above image
-        border.setAcceptedMouseButtons(Qt.NoButton)
         # Important: let mouse events go to the group (so dragging works from the image)
-        pix_item.setAcceptedMouseButtons(Qt.NoButton)    
-        
+        pix_item.setAcceptedMouseButtons(Qt.NoButton)
+        #cache the rasterization at device resolution so dragging/panning the
+        #band is a plain blit
+        pix_item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
-        #marker Y's relative to crop top; scale them vertically by the same factor
-        y_locals = [m["y"] - src_scene_rect.top() for m in markers]
-        
-        #Add ticks + labels as children of the group (negative x = outside the image)
-        pen = QPen(Qt.black)
-        tick_items = []
-        x1 = -2.0
-        x0 = x1 - 20.0  # 20 px tick length
-        
-        for m, y_local in zip(markers, y_locals):
-            y = y_local * scale
-            
-            line = QGraphicsLineItem(x0, y, x1, y, group)
-            line.setPen(pen)
-            line.setAcceptedMouseButtons(Qt.NoButton)
-            
-            lab = QGraphicsSimpleTextItem(f"{m['kda']:g}", group)
-            lab.setFont(QFont("Arial", 10))
-            lab.setBrush(Qt.black)
-            br = lab.boundingRect()
-            lab.setPos(x0 - 6.0 - br.width(), y - br.height() / 2.0)
-            lab.setAcceptedMouseButtons(Qt.NoButton)
-
-            tick_items.append((line, lab))
-
-        #protein name at right, vertically centered; child of the group
-        name_item = QGraphicsSimpleTextItem(protein_name, group)
-        name_item.setFont(QFont("Arial", 12))
-        name_item.setBrush(Qt.black)
-        nbr = name_item.boundingRect()
-        name_item.setPos(scaled_pm.width() + 10, scaled_pm.height() / 2.0 - nbr.height() / 2.0)
-        name_item.setAcceptedMouseButtons(Qt.NoButton)
+        #marker Y's relative to crop top; scale them vertically by the same
+        #factor. A tuple: computed once, never mutated after this point.
+        y_locals = tuple(m["y"] - src_scene_rect.top() for m in markers)
+
+        #single rasterized child carrying ticks + labels + name + border
+        anno_item = QGraphicsPixmapItem(group)
+        anno_item.setZValue(10)  # above image
+        anno_item.setAcceptedMouseButtons(Qt.NoButton)
+        #device coordinates like the image: the cached raster is stored at
+        #screen resolution, so blits never resample the tick/label pixels
+        anno_item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+        #spill the full-res crop to disk; the band keeps only the path (plus a
+        #hot copy in QPixmapCache) so big figures don't pin every crop in RAM
+        self._crop_seq += 1
+        orig_path = os.path.join(self._crop_store.name, f"crop{self._crop_seq}.png")
+        pixmap.save(orig_path, "PNG")
+        QPixmapCache.insert("wbtool/orig:" + orig_path, pixmap)
 
         #save the parameters. Add them to what the figure holds
         band = {
             "group": group,
             "pix_item": pix_item,
-            "orig_pixmap": pixmap,
+            "anno_item": anno_item,
+            "orig_path": orig_path,
+            "src_w": max(1.0, src_scene_rect.width()),
             "y_locals": y_locals,
-            "ticks": tick_items,
-            "name_item": name_item,
+            "kda": [m["kda"] for m in markers],
+            "protein_name": protein_name,
             "width": target_w,
-            "border_item": border
         }
+        anno_pm, left_w, pad_y, name_w = _render_annotation_pixmap(
+            band, scaled_pm.width(), scaled_pm.height()
+        )
+        anno_item.setPixmap(anno_pm)
+        anno_item.setPos(-left_w, -pad_y)
+        #seed the width cache with the scale we just paid for, so coming back
+        #to the initial width is a hit like any other (fast previews are not
+        #cache material - the deferred smooth pass replaces them)
+        if needs_smooth:
+            #the new band is auto-selected, so bumps can start immediately;
+            #going through the band's own settle timer means such a bump just
+            #overwrites pending_width instead of being reverted by a detached
+            #callback still aimed at the creation width
+            self._schedule_smooth_pass(band, target_w)
+        else:
+            band["scale_cache"] = OrderedDict({target_w: scaled_pm})
+            QPixmapCache.insert(f"{orig_path}:{target_w}", scaled_pm)
+
         self.figure_bands.append(band)
+        self._group_to_band[group] = band
         self.selected_band = band
         self.last_band_width = target_w
 
+        #file away pre-scaled widths that already arrived; late worker results
+        #find the band through the token from now on
+        if prescale_token:
+            if prescale_token in self._prescale_pending:
+                self._prescale_bands[prescale_token] = band
+            for w, img in ready.items():
+                self._seed_scale_cache(band, w, img)
 
-        required_w = self.figure_left_margin + scaled_pm.width() + 10 + nbr.width() + 40
-        #if too big, scale
-        if required_w > self.figure_scene.sceneRect().width():
-            r = self.figure_scene.sceneRect()
-            self.figure_scene.setSceneRect(0, 0, max(required_w, self.figure_min_width), r.height())
 
+        required_w = self.figure_left_margin + scaled_pm.width() + 10 + name_w + 40
         self.figure_next_y += scaled_pm.height() + 30
-        if self.figure_next_y + 200 > self.figure_scene.sceneRect().height():
-            r = self.figure_scene.sceneRect()
-            self.figure_scene.setSceneRect(0, 0, r.width(), r.height() + 800)
-        
+        #one setSceneRect at most, covering both the width and height growth
+        self._grow_figure_scene(required_w, self.figure_next_y + 200)
+
         #autocsrolls so that it's visible
         self.figure_view.ensureVisible(0, self.figure_next_y, 10, 10)
 
+    def _grow_figure_scene(self, required_w: float = 0.0, required_h: float = 0.0):
+        #grow the figure scene if needed; emits at most one sceneRectChanged
+        new_w = self._scene_w
+        new_h = self._scene_h
+        if required_w > new_w:
+            new_w = max(required_w, self.figure_min_width)
+        if required_h > new_h:
+            new_h = max(required_h, new_h + 800.0)  #grow in big steps
+        if new_w != self._scene_w or new_h != self._scene_h:
+            self._scene_w = new_w
+            self._scene_h = new_h
+            self.figure_scene.setSceneRect(0, 0, new_w, new_h)
+
     def on_selection_changed(self):
         #changes the selected crop ('band') when clicked (called when clicked)
-        self.selected_band = None
-        for b in self.figure_bands:
-            if b["group"].isSelected():
-                self.selected_band = b
-                break
+        #Qt already knows the selection set: O(1) lookup instead of polling bands
+        sel = self.figure_scene.selectedItems()
+        self.selected_band = self._group_to_band.get(sel[0]) if sel else None
 
     def bump_selected_width(self, factor: float):
         #changes width (called in dec/inc action when [/] pressed)
         if not self.selected_band:
             return
-        new_w = max(10, int(self.selected_band["width"] * factor))
+        band = self.selected_band
+        new_w = max(10, int(band["width"] * factor))
+        #when bumps arrive faster than a frame, skip even the fast preview and
+        #only keep the accumulated width - the settle timer applies it
+        timer = band.get("smooth_timer")
+        if timer is not None and timer.isActive() and self._bump_clock.elapsed() < 16:
+            band["width"] = new_w
+            band["pending_width"] = new_w
+            timer.start()
+            return
+        self._bump_clock.restart()
         #call the resizing function with the required parameters
-        self.resize_band_by_width(self.selected_band, new_w)
+        self.resize_band_by_width(band, new_w)
     
     def nudge_selected(self, dy: int):
         if not self.selected_band:
             return
-        g = self.selected_band["group"]
-        # keep x locked to the left margin; only change y
-        g.setPos(self.figure_left_margin, g.pos().y() + dy)
+        # translate the whole group; itemChange keeps x locked to the margin
+        self.selected_band["group"].moveBy(0, dy)
 
 
     def set_selected_width_dialog(self):
@@ -445,55 +1009,127 @@ class MainWindow(QMainWindow):
         cur = int(self.selected_band["width"])
         val, ok = QInputDialog.getInt(self, "Set width", "Width (pixels):", cur, 10, 20000, 1)
         if ok:
-            #call the resizing function with the required parameters
-            self.resize_band_by_width(self.selected_band, int(val))
+            #typed-in width is a one-off, so go straight to the smooth scale
+            self.resize_band_by_width(self.selected_band, int(val), final=True)
+
+    def resize_band_by_width(self, band: dict, new_width: int, final: bool = False):
+        """Resize a band (BandGroup version): scale image by width and reposition ticks/name inside the group.
+
+        With final=False (key-repeat) the image is rescaled with the cheap
+        Qt.FastTransformation and a smooth re-run is scheduled for when the
+        burst of width changes settles; final=True uses the cached smooth
+        scale, or computes it on the thread pool while fast pixels stay up.
+        """
+        #belt and braces against stale timers/workers: a band that's been
+        #cleared from the figure must not be resized back to life
+        if band["group"] not in self._group_to_band:
+            return
+        if final:
+            timer = band.get("smooth_timer")
+            if timer is not None:
+                timer.stop()  #a stale deferred pass must not override this width
+            scaled_pm = _cached_scaled_pixmap(band, new_width)
+            if scaled_pm is None:
+                orig = _band_orig_pixmap(band)
+                if orig.isNull():
+                    return  #spilled crop is gone; nothing to scale from
+                #smooth-scale off the GUI thread (QImage is thread-safe);
+                #_on_scaled_image_ready swaps the result in when it lands
+                self._next_scale_token += 1
+                self._resize_bands[self._next_scale_token] = band
+                QThreadPool.globalInstance().start(_ImageScaleTask(
+                    self._next_scale_token, orig.toImage(),
+                    new_width, self._scale_signals
+                ))
+                if band["width"] == new_width:
+                    #a fast preview at this width is already on screen; the
+                    #worker result arrives at exactly this width too, so the
+                    #swap-in is pixel-for-pixel and never snaps the layout
+                    return
+                scaled_pm = _band_preview_pixmap(band, new_width).scaledToWidth(
+                    new_width, Qt.FastTransformation)
+        else:
+            scaled_pm = _band_preview_pixmap(band, new_width).scaledToWidth(
+                new_width, Qt.FastTransformation)
+            self._schedule_smooth_pass(band, new_width)
+        self._apply_band_pixmap(band, new_width, scaled_pm)
+
+    def _schedule_smooth_pass(self, band: dict, new_width: int):
+        #(re)start the band's settle countdown; only the last requested width
+        #gets the smooth resample - later requests just overwrite pending_width
+        timer = band.get("smooth_timer")
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(_SMOOTH_SETTLE_MS)
+            timer.timeout.connect(
+                lambda b=band: self.resize_band_by_width(b, b["pending_width"], final=True)
+            )
+            band["smooth_timer"] = timer
+        band["pending_width"] = new_width
+        timer.start()  #restarts the countdown if already running
 
-    def resize_band_by_width(self, band: dict, new_width: int):
-        """Resize a band (BandGroup version): scale image by width and reposition ticks/name inside the group."""
-        scaled_pm = band["orig_pixmap"].scaledToWidth(new_width, Qt.SmoothTransformation)
+    def match_widths_to_selected(self):
+        #bulk width transform: give every band the selected band's width. Cache
+        #misses go to the thread pool, so the smooth scales run in parallel.
+        if not self.selected_band:
+            return
+        w = int(self.selected_band["width"])
+        for band in self.figure_bands:
+            if band["width"] != w:
+                self.resize_band_by_width(band, w, final=True)
+
+    def _apply_band_pixmap(self, band: dict, new_width: int, scaled_pm: QPixmap):
+        #puts a scaled pixmap on screen: image, hitbox, annotation overlay,
+        #bookkeeping, scene growth
         band["pix_item"].setPixmap(scaled_pm)
-    
+
         # Update the group's hitbox to match new image size
         band["group"].setRect(0, 0, scaled_pm.width(), scaled_pm.height())
-        band["border_item"].setRect(0, 0, scaled_pm.width(), scaled_pm.height())
-        scale = new_width / band["orig_pixmap"].width()
-    
-        # Tick x positions are relative to group (negative = outside the image)
-        x1 = -2.0
-        x0 = x1 - 20.0
-    
-        for (line, lab), y_local in zip(band["ticks"], band["y_locals"]):
-            y = y_local * scale
-            line.setLine(x0, y, x1, y)
-    
-            br = lab.boundingRect()
-            lab.setPos(x0 - 6.0 - br.width(), y - br.height() / 2.0)
-    
-        # Protein name stays to the right of the image, centered vertically
-        nbr = band["name_item"].boundingRect()
-        band["name_item"].setPos(
-            scaled_pm.width() + 10,
-            scaled_pm.height() / 2.0 - nbr.height() / 2.0
+
+        # Re-render the annotation overlay (ticks/labels/name/border) for the new width
+        anno_pm, left_w, pad_y, name_w = _render_annotation_pixmap(
+            band, scaled_pm.width(), scaled_pm.height()
         )
-    
+        band["anno_item"].setPixmap(anno_pm)
+        band["anno_item"].setPos(-left_w, -pad_y)
+
         band["width"] = new_width
         self.last_band_width = new_width
-    
+
         # Grow the figure scene width if needed (use the group's scene position)
         group_x = band["group"].scenePos().x()
-        required_w = group_x + scaled_pm.width() + 10 + nbr.width() + 40
-        if required_w > self.figure_scene.sceneRect().width():
-            r = self.figure_scene.sceneRect()
-            self.figure_scene.setSceneRect(0, 0, max(required_w, self.figure_min_width), r.height())
+        self._grow_figure_scene(group_x + scaled_pm.width() + 10 + name_w + 40)
 
 
     def clear_figure(self):
-        self.figure_scene.clear()
+        #every top-level item in this scene is a band group, so removing the
+        #groups (children go with them) beats scene.clear() tearing down and
+        #re-creating scene internals
+        remove = self.figure_scene.removeItem
+        for b in self.figure_bands:
+            #a pending settle timer must not fire after its band is gone - it
+            #would re-render orphaned items and reload the deleted crop
+            timer = b.pop("smooth_timer", None)
+            if timer is not None:
+                timer.stop()
+            remove(b["group"])
+            try:
+                os.remove(b["orig_path"])  #spilled crop is no longer reachable
+            except OSError:
+                pass
         self.figure_bands.clear()
+        self._group_to_band.clear()
+        self._prescaled.clear()
+        self._prescale_bands.clear()
+        self._prescale_pending.clear()
+        self._resize_bands.clear()
         self.selected_band = None
         self.figure_next_y = 20
         self.last_band_width = None
-        self.figure_scene.setSceneRect(0, 0, self.figure_min_width, 1200)
+        self._scene_w = float(self.figure_min_width)
+        self._scene_h = 1200.0
+        self.figure_scene.setSceneRect(0, 0, self._scene_w, self._scene_h)
     
     def export_text(self): #test function
         path, _ = QFileDialog.getSaveFileName(self, "Write text", "file.txt", "TXT (*.txt)")
@@ -520,42 +1156,75 @@ class MainWindow(QMainWindow):
         dpi, ok = QInputDialog.getInt(self, "PDF DPI", "Raster DPI for images:", 300, 72, 1200, 1)
         if not ok:
             return
-    
-        # QPrinter in PDF mode
-        printer = QPrinter(QPrinter.HighResolution)
-        printer.setOutputFormat(QPrinter.PdfFormat)
-        printer.setOutputFileName(path)
-        printer.setResolution(dpi)
-    
-        # Standard a4
-        printer.setPageSize(QPageSize.A4)
-    
-        painter = QPainter(printer)
-    #     painter.setRenderHint(QPainter.Antialiasing, True)
-    #     painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
-        
-        page = QRectF(printer.pageRect(QPrinter.DevicePixel))
-    
+
+        # Page geometry from a probe printer; the worker re-creates an identical
+        # one on its own thread for the actual write
+        probe = QPrinter(QPrinter.HighResolution)
+        probe.setOutputFormat(QPrinter.PdfFormat)
+        probe.setResolution(dpi)
+        probe.setPageSize(QPageSize.A4)
+        page = QRectF(probe.pageRect(QPrinter.DevicePixel))
+
         # Fit scene content into the printable page while preserving aspect ratio
         sx = page.width() / content.width()
         sy = page.height() / content.height()
         s = min(sx, sy)  # uniform scale to fit
-        
+
         # Center it on the page
-        target_w = content.width() * s
-        target_h = content.height() * s
-        target = QRectF(
-            page.left() + (page.width() - target_w) / 2.0,
-            page.top()  + (page.height() - target_h) / 2.0,
-            target_w,
-            target_h
-            )
+        target_w = max(1, int(content.width() * s))
+        target_h = max(1, int(content.height() * s))
+        left = page.left() + (page.width() - target_w) / 2.0
+        top = page.top() + (page.height() - target_h) / 2.0
 
-        self.figure_scene.render(painter, target=target, source=content)
+        # Rasterize in horizontal strips and stream them to the writer: render
+        # one strip, hand it off, render the next when the worker asks. Scene
+        # rendering has to stay on the GUI thread; the PDF write runs on the
+        # pool, and peak memory is about two strips rather than the full page
+        # raster (an A4 page at 1200 dpi is ~140 MP).
+        if self._export_job is not None:
+            QMessageBox.information(self, "Export running", "A PDF export is already in progress.")
+            return
+        self._export_job = {
+            "queue": queue.Queue(),
+            "content": content,
+            "scale": s,
+            "target_w": target_w,
+            "target_h": target_h,
+            "left": left,
+            "top": top,
+            "strip_h": max(1, _EXPORT_STRIP_PX // target_w),
+            "y": 0,
+        }
+        self._render_next_export_strip()  #prime the pipeline with one strip
+        QThreadPool.globalInstance().start(
+            _PdfWriteTask(path, dpi, self._export_job["queue"], self._pdf_signals)
+        )
+
+    def _render_next_export_strip(self):
+        #producer side of the export stream: called once to prime and then
+        #each time the writer finishes a strip
+        job = self._export_job
+        if job is None:
+            return
+        y = job["y"]
+        if y >= job["target_h"]:
+            job["queue"].put(None)  #stream complete
+            return
+        content, s = job["content"], job["scale"]
+        h = min(job["strip_h"], job["target_h"] - y)
+        img = QImage(job["target_w"], h, QImage.Format_ARGB32_Premultiplied)
+        img.fill(Qt.white)
+        painter = QPainter(img)
+        src = QRectF(content.left(), content.top() + y / s, content.width(), h / s)
+        self.figure_scene.render(painter, QRectF(0, 0, job["target_w"], h), src)
         painter.end()
+        job["y"] = y + h
+        job["queue"].put((QPointF(job["left"], job["top"] + y), img))
 
-    
-    #     painter.end()
+    def _on_pdf_export_finished(self, error: str):
+        self._export_job = None
+        if error:
+            QMessageBox.warning(self, "Export failed", error)
 
 # if __name__ == "__main__":
 #     app = QApplication.instance()
@@ -571,6 +1240,11 @@ class MainWindow(QMainWindow):
 def main():
     app = QApplication.instance()
     if app is None:
+        #no MSAA: the views only composite pixmaps, and multisampling costs
+        #fill rate on every GL frame (must be set before the QApplication)
+        fmt = QSurfaceFormat()
+        fmt.setSamples(0)
+        QSurfaceFormat.setDefaultFormat(fmt)
         app = QApplication(sys.argv)
 
     win = MainWindow()